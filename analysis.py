@@ -1,91 +1,304 @@
+import concurrent.futures
+import gzip
+import hashlib
 import json
+import mmap
 import os
-from collections import defaultdict
+import re
+import tempfile
+from collections import Counter
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+import orjson
+import pypdfium2 as pdfium
 from PyPDF2 import PdfReader
 from bs4 import BeautifulSoup
 import plotly.graph_objects as go
 import webbrowser
 
-LIBRARY_PATH = os.path.join('AIPolicies_db', 'metadata', 'library.json')
+LIBRARY_PATH = os.path.join('AIPolicies_db', 'metadata', 'library.jsonl')
 DOCS_ROOT = os.path.join('AIPolicies_db', 'documents')
+TEXT_CACHE_DIR = os.path.join('AIPolicies_db', '.textcache')
 
-KEYWORDS = [
+# Tuples: immutable module constants, never rebuilt
+KEYWORDS = (
     'environment', 'climate', 'energy', 'sustainability',
     'carbon', 'emission', 'renewable', 'net zero', 'green'
-]
+)
 
-SEARCH_FIELDS = ['title', 'abstract', 'note', 'extra_keywords']
+SEARCH_FIELDS = ('title', 'abstract', 'note', 'extra_keywords')
+
+# Single alternation regex: one sre scan over the text instead of one
+# substring pass per keyword
+_KW_RE = re.compile('|'.join(re.escape(kw) for kw in KEYWORDS))
+
+if hyperscan is not None:
+    # Hyperscan compiles the keyword set to a SIMD DFA that scans bytes
+    # at vector width -- the fastest option for multi-MB fulltexts
+    _HS_DB = hyperscan.Database()
+    _HS_DB.compile(expressions=[re.escape(kw).encode() for kw in KEYWORDS],
+                   flags=[hyperscan.HS_FLAG_CASELESS] * len(KEYWORDS))
+    _HS_TERMINATED = getattr(hyperscan, 'ScanTerminated', ())
+
+    def _hs_on_match(match_id, start, end, flags, context):
+        context[0] = True
+        return hyperscan.HS_SCAN_TERMINATED
+
+    def contains_keyword(text_lower):
+        hit = [False]
+        try:
+            _HS_DB.scan(text_lower.encode(), match_event_handler=_hs_on_match, context=hit)
+        except _HS_TERMINATED:
+            pass
+        return hit[0]
+elif ahocorasick is not None:
+    # Aho-Corasick automaton built once so each string is scanned in a
+    # single pass instead of once per keyword
+    AC = ahocorasick.Automaton()
+    for kw in KEYWORDS:
+        AC.add_word(kw, kw)
+    AC.make_automaton()
+
+    def contains_keyword(text_lower):
+        return next(AC.iter(text_lower), None) is not None
+else:
+    try:
+        # Without pyahocorasick, at least move the byte scan out of the
+        # interpreter: a numba-compiled matcher over a uint8 view of the
+        # text runs the inner loops as machine code
+        import numpy as np
+        from numba import njit
+        from numba.typed import List as NumbaList
+
+        @njit(cache=True)
+        def _any_kw_hit(buf, kws):
+            for kw in kws:
+                for i in range(len(buf) - len(kw) + 1):
+                    hit = True
+                    for j in range(len(kw)):
+                        if buf[i + j] != kw[j]:
+                            hit = False
+                            break
+                    if hit:
+                        return True
+            return False
+
+        _KW_BYTES = NumbaList()
+        for kw in KEYWORDS:
+            _KW_BYTES.append(np.frombuffer(kw.encode(), dtype=np.uint8))
+
+        def contains_keyword(text_lower):
+            buf = np.frombuffer(text_lower.encode(), dtype=np.uint8)
+            return _any_kw_hit(buf, _KW_BYTES)
+    except ImportError:
+        # Last resort: single compiled-alternation scan
+        def contains_keyword(text_lower):
+            return _KW_RE.search(text_lower) is not None
 
 
 def load_documents(path):
-    with open(path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    return data['documents']
+    # The library is stored as JSON Lines (one document per line) so
+    # documents stream in one at a time instead of the whole file being
+    # parsed up front. Older conversions wrote a single library.json;
+    # fall back to that if the JSONL file is absent
+    if not os.path.exists(path):
+        legacy_path = os.path.join(os.path.dirname(path), 'library.json')
+        if os.path.exists(legacy_path):
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                yield from json.load(f)['documents']
+            return
+    with open(path, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield orjson.loads(line)
 
 
-def extract_text_from_pdf(pdf_path):
+def iter_pages_from_pdf(pdf_path):
+    # PDFium (C library) extracts text roughly an order of magnitude
+    # faster than PyPDF2, which stays as a fallback for files PDFium
+    # refuses to open
+    try:
+        pdf = pdfium.PdfDocument(pdf_path)
+    except Exception as e:
+        print(f"[WARN] PDFium could not open PDF, trying PyPDF2: {pdf_path} ({e})")
+        yield from iter_pages_from_pdf_pypdf2(pdf_path)
+        return
     try:
-        reader = PdfReader(pdf_path)
-        text = "\n".join(page.extract_text() or '' for page in reader.pages)
-        return text
+        for page in pdf:
+            yield page.get_textpage().get_text_range()
     except Exception as e:
         print(f"[WARN] Could not read PDF: {pdf_path} ({e})")
-        return ''
+    finally:
+        pdf.close()
+
+
+def iter_pages_from_pdf_pypdf2(pdf_path):
+    try:
+        with open(pdf_path, 'rb') as f:
+            # Map the whole file so PyPDF2's many small seek/read calls
+            # are served straight from the OS page cache instead of
+            # going through Python-level buffered IO
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                reader = PdfReader(mm)
+                for page in reader.pages:
+                    yield page.extract_text() or ''
+    except Exception as e:
+        print(f"[WARN] Could not read PDF: {pdf_path} ({e})")
+
+
+def extract_text_from_pdf(pdf_path):
+    return "\n".join(iter_pages_from_pdf(pdf_path))
 
 
 def extract_text_from_html(html_path):
     try:
         with open(html_path, 'r', encoding='utf-8', errors='ignore') as f:
-            soup = BeautifulSoup(f, 'html.parser')
+            # lxml (libxml2, C) parses large policy pages several times
+            # faster than the stdlib html.parser; requires the lxml package
+            soup = BeautifulSoup(f, 'lxml')
             return soup.get_text(separator=' ', strip=True)
     except Exception as e:
         print(f"[WARN] Could not read HTML: {html_path} ({e})")
         return ''
 
 
-def extract_fulltext_from_files(file_paths):
-    # Only html and pdf is included because the dataset has only 
-    #  these filetypes thus far
-    fulltext = ''
+def cache_path_for(abs_path):
+    # Extraction is by far the slowest step (seconds per PDF), so the
+    # lowercased text is cached on disk keyed by path+mtime+size and
+    # reused until the file changes
+    try:
+        st = os.stat(abs_path)
+    except OSError as e:
+        print(f"[WARN] Could not stat file: {abs_path} ({e})")
+        return None
+    key = hashlib.blake2b(f"{abs_path}:{st.st_mtime_ns}:{st.st_size}".encode()).hexdigest()
+    return os.path.join(TEXT_CACHE_DIR, f"{key}.txt.gz")
+
+
+def read_cache_entry(cache_path):
+    try:
+        with gzip.open(cache_path, 'rt', encoding='utf-8') as f:
+            return f.read()
+    # EOFError: a truncated gzip only fails once decompression hits the end
+    except (OSError, EOFError) as e:
+        print(f"[WARN] Could not read cache entry: {cache_path} ({e})")
+        return None
+
+
+def write_cache_entry(cache_path, text):
+    # Write to a unique temp file then rename: readers never see partial
+    # entries, and pool workers caching the same file concurrently (e.g.
+    # duplicate bib entries sharing file_paths) cannot rename each
+    # other's temp away. A failed write only loses the optimization, so
+    # warn and continue rather than abort the analysis
+    tmp_path = None
+    try:
+        os.makedirs(TEXT_CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=TEXT_CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as raw:
+            with gzip.open(raw, 'wt', encoding='utf-8') as f:
+                f.write(text)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"[WARN] Could not write cache entry: {cache_path} ({e})")
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
+def iter_fulltext_lower(file_paths):
+    # Only html and pdf is included because the dataset has only
+    #  these filetypes thus far. Yields lowercased text one chunk at a
+    # time (per cached file, or per PDF page) so callers can stop at the
+    # first keyword hit without extracting the rest of a long PDF, and
+    # never pay .lower() twice: the cache stores the lowercased form. A
+    # partially consumed PDF is simply left uncached.
     for rel_path in file_paths:
         abs_path = os.path.join('AIPolicies_db', rel_path.replace('\\', '/'))
+        if not abs_path.lower().endswith(('.pdf', '.html')):
+            continue
+        cache_path = cache_path_for(abs_path)
+        if cache_path is None:
+            continue
+        if os.path.exists(cache_path):
+            text = read_cache_entry(cache_path)
+            if text is not None:
+                yield text
+                continue
         if abs_path.lower().endswith('.pdf'):
-            fulltext += extract_text_from_pdf(abs_path) + '\n'
-        elif abs_path.lower().endswith('.html'):
-            fulltext += extract_text_from_html(abs_path) + '\n'
-    return fulltext
+            pages = []
+            for page_text in iter_pages_from_pdf(abs_path):
+                page_lower = page_text.lower()
+                pages.append(page_lower)
+                yield page_lower
+            write_cache_entry(cache_path, "\n".join(pages))
+        else:
+            text = extract_text_from_html(abs_path).lower()
+            write_cache_entry(cache_path, text)
+            yield text
 
 
-def document_references_environment(doc):
+def build_columns(documents):
+    # Struct-of-arrays view of the only fields the tag stats touch,
+    # built in one pass over the (possibly lazy) document stream so the
+    # full ~25-key dicts are never retained. Metadata is pre-joined and
+    # pre-lowercased here so the hot loop scans one flat string per doc
+    tags_col = []
+    file_paths_col = []
+    metadata_col = []
+    for doc in documents:
+        tags_col.append(doc.get('tags', []))
+        file_paths_col.append(doc.get('file_paths', []))
+        # Joined with newline so a multi-word keyword ('net zero') can
+        # never match across a field boundary
+        metadata_col.append(
+            '\n'.join(doc[field] for field in SEARCH_FIELDS if doc.get(field)).lower())
+    return tags_col, file_paths_col, metadata_col
+
+
+def check_env_reference(args):
+    metadata_lower, file_paths = args
     # Look through metadata
-    for field in SEARCH_FIELDS:
-        value = doc.get(field, '')
-        if value:
-            value_lower = value.lower()
-            for kw in KEYWORDS:
-                if kw in value_lower:
-                    return True
+    if metadata_lower and contains_keyword(metadata_lower):
+        return True
     # Look through the file
-    file_paths = doc.get('file_paths', [])
-    if file_paths:
-        fulltext = extract_fulltext_from_files(file_paths)
-        fulltext_lower = fulltext.lower()
-        for kw in KEYWORDS:
-            if kw in fulltext_lower:
-                return True
+    for chunk in iter_fulltext_lower(file_paths):
+        if contains_keyword(chunk):
+            return True
     return False
 
 
+def document_references_environment(doc):
+    metadata_lower = '\n'.join(doc[field] for field in SEARCH_FIELDS if doc.get(field)).lower()
+    return check_env_reference((metadata_lower, doc.get('file_paths', [])))
+
+
 def group_stats_by_tag(documents):
-    tag_env_counts = defaultdict(int)
-    tag_total_counts = defaultdict(int)
-    for doc in documents:
-        tags = doc.get('tags', [])
-        for tag in tags:
-            tag_total_counts[tag] += 1
-        if document_references_environment(doc):
-            for tag in tags:
-                tag_env_counts[tag] += 1
+    # Counter.update runs the per-tag counting in C instead of a Python
+    # += 1 loop
+    tag_env_counts = Counter()
+    tag_total_counts = Counter()
+    tags_col, file_paths_col, metadata_col = build_columns(documents)
+    # The env-reference check may parse several PDFs per document, which
+    # is CPU-bound, so documents are checked across all cores. KEYWORDS,
+    # SEARCH_FIELDS and the automaton live at module scope so workers
+    # get them for free (fork) or rebuild them on import (spawn)
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+        env_flags = list(executor.map(check_env_reference,
+                                      zip(metadata_col, file_paths_col), chunksize=8))
+    for tags, has_env in zip(tags_col, env_flags):
+        tag_total_counts.update(tags)
+        if has_env:
+            tag_env_counts.update(tags)
     return tag_env_counts, tag_total_counts
 
 
@@ -5,9 +5,11 @@ Convert Zotero BibTeX export + files folder to GitHub
 """
 
 import json
+import orjson
 import os
 import shutil
 import re
+from collections import defaultdict
 from pathlib import Path
 import bibtexparser
 from bibtexparser.bparser import BibTexParser
@@ -15,14 +17,19 @@ from bibtexparser.customization import convert_to_unicode
 import argparse
 from datetime import datetime
 
+# Compiled once at module load; clean_filename runs twice per entry
+_PAT_BAD = re.compile(r'[<>:"/\\|?*]')
+_PAT_WS = re.compile(r'\s+')
+_PAT_SPEC = re.compile(r'[^\w\s-]')
+
 def clean_filename(text):
     """Clean text for use as filename"""
     if not text:
         return "untitled"
     # Remove/replace problematic characters
-    text = re.sub(r'[<>:"/\\|?*]', '', text)
-    text = re.sub(r'\s+', '_', text)
-    text = re.sub(r'[^\w\s-]', '', text)  # Remove special chars except dash
+    text = _PAT_BAD.sub('', text)
+    text = _PAT_WS.sub('_', text)
+    text = _PAT_SPEC.sub('', text)  # Remove special chars except dash
     return text[:80]  # Reasonable length limit
 
 def parse_zotero_file_field(file_field):
@@ -46,14 +53,31 @@ def parse_zotero_file_field(file_field):
     
     return files
 
-def find_pdf_in_files_folder(entry, files_dir):
-    """Find PDF files for a BibTeX entry in the files folder"""
+# Unlike \w+ this treats '_' as a separator, since organized filenames
+# are underscore-joined (Author_Year_Title.pdf)
+_WORD_RE = re.compile(r'[^\W_]+')
+
+def build_pdf_indexes(files_dir):
+    """Index every PDF under files_dir by lowercased filename and by the
+    words in its stem (one scan up front instead of a recursive glob per
+    entry)"""
+    pdf_index = defaultdict(list)
+    word_index = defaultdict(list)
+    if files_dir and os.path.exists(files_dir):
+        for pdf_file in Path(files_dir).rglob('*.pdf'):
+            pdf_index[pdf_file.name.lower()].append(pdf_file)
+            for word in set(_WORD_RE.findall(pdf_file.stem.lower())):
+                word_index[word].append(pdf_file)
+    return pdf_index, word_index
+
+def find_pdf_in_files_folder(entry, files_dir, pdf_index, word_index):
+    """Find PDF files for a BibTeX entry using the prebuilt PDF index"""
     if not files_dir or not os.path.exists(files_dir):
         return []
-    
+
     files_path = Path(files_dir)
     found_pdfs = []
-    
+
     # Method 1: Use file field if available
     if 'file' in entry:
         zotero_files = parse_zotero_file_field(entry['file'])
@@ -64,53 +88,47 @@ def find_pdf_in_files_folder(entry, files_dir):
                 if pdf_path.exists():
                     found_pdfs.append(pdf_path)
                 else:
-                    # Try searching by filename in all subdirectories
-                    for pdf_file in files_path.glob(f"**/{file_info['filename']}"):
-                        found_pdfs.append(pdf_file)
-    
+                    # Look up the filename in the index
+                    found_pdfs.extend(pdf_index.get(file_info['filename'].lower(), []))
+
     # Method 2: Search by entry ID or title if no file field
     if not found_pdfs:
-        entry_id = entry.get('ID', '')
+        entry_id = entry.get('ID', '').lower()
         title = entry.get('title', '')
-        
-        # Search all PDF files in the folder
-        for pdf_file in files_path.glob('**/*.pdf'):
-            filename_lower = pdf_file.name.lower()
-            
-            # Check if filename contains entry ID
-            if entry_id and entry_id.lower() in filename_lower:
+        title_words = [word.lower() for word in title.split() if len(word) > 3][:3]
+
+        # Check if any filename contains the entry ID
+        if entry_id:
+            for filename_lower, paths in pdf_index.items():
+                if entry_id in filename_lower:
+                    found_pdfs.extend(paths)
+
+        # Resolve title words through the word index instead of scanning
+        # every filename again
+        title_matches = set()
+        for word in title_words:
+            title_matches.update(word_index.get(word, []))
+        for pdf_file in sorted(title_matches):
+            if pdf_file not in found_pdfs:
                 found_pdfs.append(pdf_file)
-                continue
-            
-            # Check if filename contains title words
-            if title:
-                title_words = [word.lower() for word in title.split() if len(word) > 3]
-                if any(word in filename_lower for word in title_words[:3]):
-                    found_pdfs.append(pdf_file)
-    
+
     return found_pdfs
 
+# Splits on all common tag delimiters in one pass
+_TAG_SPLIT = re.compile(r'[;,\n|]')
+
 def extract_tags_from_entry(entry):
     """Extract tags from various BibTeX fields"""
     tags = set()
-    
+
     # Common fields that contain tags
     tag_fields = ['keywords', 'mendeley-tags', 'tags', 'annote']
-    
+
     for field in tag_fields:
         if field in entry:
-            tag_text = entry[field]
-            # Split by common delimiters
-            for delimiter in [';', ',', '\n', '|']:
-                if delimiter in tag_text:
-                    field_tags = [tag.strip() for tag in tag_text.split(delimiter)]
-                    tags.update(tag for tag in field_tags if tag)
-                    break
-            else:
-                # No delimiter found, treat as single tag
-                if tag_text.strip():
-                    tags.add(tag_text.strip())
-    
+            field_tags = (tag.strip() for tag in _TAG_SPLIT.split(entry[field]))
+            tags.update(tag for tag in field_tags if tag)
+
     return sorted(list(tags))
 
 def categorize_entry(entry):
@@ -140,7 +158,36 @@ def categorize_entry(entry):
     
     return categories.get(entry_type, 'uncategorized')
 
-def organize_pdf_files(pdf_files, entry, output_dir):
+def place_file(src, dst, copy_mode):
+    """Put src at dst per copy_mode. Hardlinks cost no disk bandwidth
+    when source and output live on the same filesystem; fall back to a
+    real copy when linking fails (cross-device, unsupported FS)"""
+    # Re-runs find dst already in place; keep it only when it already
+    # satisfies the requested mode, otherwise replace it. lexists also
+    # catches a dangling symlink, which exists() reports as absent
+    if os.path.lexists(dst):
+        is_link = os.path.islink(dst)
+        same = os.path.exists(dst) and os.path.samefile(src, dst)
+        if copy_mode == 'hardlink' and same and not is_link:
+            return
+        if copy_mode == 'symlink' and same and is_link:
+            return
+        os.unlink(dst)
+    if copy_mode == 'hardlink':
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass
+    elif copy_mode == 'symlink':
+        try:
+            os.symlink(os.path.abspath(src), dst)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+
+def organize_pdf_files(pdf_files, entry, output_dir, copy_mode='hardlink'):
     """Copy PDF files to organized structure"""
     if not pdf_files:
         return []
@@ -183,9 +230,9 @@ def organize_pdf_files(pdf_files, entry, output_dir):
             filename = f"{base_filename}.pdf"
         
         target_path = target_dir / filename
-        
-        # Copy file
-        shutil.copy2(pdf_file, target_path)
+
+        # Copy/link file
+        place_file(pdf_file, target_path, copy_mode)
         
         # Store relative path
         relative_path = str(target_path.relative_to(output_dir))
@@ -193,7 +240,7 @@ def organize_pdf_files(pdf_files, entry, output_dir):
     
     return organized_files
 
-def process_bibtex_export(export_dir, output_dir):
+def process_bibtex_export(export_dir, output_dir, copy_mode='hardlink'):
     """Main processing function"""
     export_path = Path(export_dir)
     output_path = Path(output_dir)
@@ -218,6 +265,9 @@ def process_bibtex_export(export_dir, output_dir):
         bib_database = bibtexparser.load(f, parser=parser)
     
     print(f"Found {len(bib_database.entries)} entries in BibTeX file")
+
+    # Scan the files folder once; entries then resolve PDFs via dict lookups
+    pdf_index, word_index = build_pdf_indexes(files_dir)
     
     # Create output structure
     output_path.mkdir(exist_ok=True)
@@ -243,65 +293,74 @@ def process_bibtex_export(export_dir, output_dir):
     pdf_count = 0
     
     print(f"\nProcessing entries...")
-    
-    for i, entry in enumerate(bib_database.entries):
-        title = entry.get('title', 'Untitled')
-        print(f"  {i+1:3d}/{len(bib_database.entries)}: {title[:60]}...")
-        
+
+    # Hoist loop-invariant lookups into locals: LOAD_FAST beats
+    # LOAD_GLOBAL/LOAD_ATTR on every one of potentially thousands of entries
+    entries = bib_database.entries
+    total_entries = len(entries)
+    docs_append = database["documents"].append
+    cats = categories
+    standard_fields = frozenset(['ID', 'ENTRYTYPE', 'title', 'author', 'year', 'journal',
+                                 'booktitle', 'publisher', 'volume', 'number', 'pages',
+                                 'doi', 'url', 'isbn', 'issn', 'abstract', 'note', 'file'])
+
+    for i, entry in enumerate(entries):
+        get = entry.get
+        title = get('title', 'Untitled')
+        print(f"  {i+1:3d}/{total_entries}: {title[:60]}...")
+
         # Extract tags
         tags = extract_tags_from_entry(entry)
         all_tags.update(tags)
         
         # Find PDF files
-        pdf_files = find_pdf_in_files_folder(entry, files_dir)
-        organized_files = organize_pdf_files(pdf_files, entry, output_path)
+        pdf_files = find_pdf_in_files_folder(entry, files_dir, pdf_index, word_index)
+        organized_files = organize_pdf_files(pdf_files, entry, output_path, copy_mode)
         
         if organized_files:
             pdf_count += 1
         
         # Extract year
-        year = entry.get('year', '')
+        year = get('year', '')
         if year:
             years.add(year)
-        
+
         # Categorize
         category = categorize_entry(entry)
-        categories[category] = categories.get(category, 0) + 1
-        
+        cats[category] = cats.get(category, 0) + 1
+
         # Create document record
         doc = {
-            "id": entry.get('ID', f"doc_{i}"),
+            "id": get('ID', f"doc_{i}"),
             "title": title,
-            "authors": entry.get('author', '').replace(' and ', ', '),
+            "authors": get('author', '').replace(' and ', ', '),
             "year": year,
-            "journal": entry.get('journal', ''),
-            "booktitle": entry.get('booktitle', ''),
-            "publisher": entry.get('publisher', ''),
-            "volume": entry.get('volume', ''),
-            "number": entry.get('number', ''),
-            "pages": entry.get('pages', ''),
-            "doi": entry.get('doi', ''),
-            "url": entry.get('url', ''),
-            "isbn": entry.get('isbn', ''),
-            "issn": entry.get('issn', ''),
-            "abstract": entry.get('abstract', ''),
-            "note": entry.get('note', ''),
+            "journal": get('journal', ''),
+            "booktitle": get('booktitle', ''),
+            "publisher": get('publisher', ''),
+            "volume": get('volume', ''),
+            "number": get('number', ''),
+            "pages": get('pages', ''),
+            "doi": get('doi', ''),
+            "url": get('url', ''),
+            "isbn": get('isbn', ''),
+            "issn": get('issn', ''),
+            "abstract": get('abstract', ''),
+            "note": get('note', ''),
             "tags": tags,
             "category": category,
-            "entry_type": entry.get('ENTRYTYPE', ''),
+            "entry_type": get('ENTRYTYPE', ''),
             "file_paths": organized_files,
             "has_pdf": len(organized_files) > 0,
             "pdf_count": len(organized_files)
         }
-        
+
         # Add any additional fields
         for key, value in entry.items():
-            if key not in ['ID', 'ENTRYTYPE', 'title', 'author', 'year', 'journal', 
-                          'booktitle', 'publisher', 'volume', 'number', 'pages', 
-                          'doi', 'url', 'isbn', 'issn', 'abstract', 'note', 'file'] and value:
+            if key not in standard_fields and value:
                 doc[f"extra_{key}"] = value
-        
-        database["documents"].append(doc)
+
+        docs_append(doc)
     
     # Update statistics
     database["info"]["categories"] = categories
@@ -327,9 +386,17 @@ def process_bibtex_export(export_dir, output_dir):
 def save_database_files(output_path, database, all_tags, categories):
     """Save all database files"""
     
-    # Main database
-    with open(output_path / 'metadata' / 'library.json', 'w', encoding='utf-8') as f:
-        json.dump(database, f, indent=2, ensure_ascii=False)
+    # Main database as JSON Lines, one document per line, so consumers
+    # can stream documents instead of parsing the whole library at once
+    # (orjson: C-backed encoder, writes UTF-8 directly)
+    with open(output_path / 'metadata' / 'library.jsonl', 'wb') as f:
+        for doc in database['documents']:
+            f.write(orjson.dumps(doc))
+            f.write(b'\n')
+
+    # Top-level stats live in a small separate file
+    with open(output_path / 'metadata' / 'library_info.json', 'wb') as f:
+        f.write(orjson.dumps(database['info'], option=orjson.OPT_INDENT_2))
     
     # Tags index
     with open(output_path / 'metadata' / 'tags.json', 'w', encoding='utf-8') as f:
@@ -344,29 +411,35 @@ def save_database_files(output_path, database, all_tags, categories):
 
 def create_readme(output_path, database):
     """Create comprehensive README.md file"""
+    info = database['info']
+    total = info['total_documents']
+
+    # Collect lines and join once at the end; += concatenation in a loop
+    # reallocates the growing string
+    category_lines = [
+        f"- **{category.replace('_', ' ').title()}**: {count} documents ({count / total * 100:.1f}%)"
+        for category, count in sorted(info['categories'].items())
+    ]
+    categories_md = '\n'.join(category_lines)
+
     readme_content = f"""# Research Library Database
 
-Converted from Zotero BibTeX export on {database['info']['created']}
+Converted from Zotero BibTeX export on {info['created']}
 
 ## 📊 Statistics
-- **Total Documents**: {database['info']['total_documents']}
-- **Documents with PDFs**: {database['info']['with_pdfs']}
-- **Categories**: {len(database['info']['categories'])}
-- **Unique Tags**: {database['info']['total_tags']}
-- **Year Range**: {database['info']['years'][0] if database['info']['years'] else 'N/A'} - {database['info']['years'][-1] if database['info']['years'] else 'N/A'}
+- **Total Documents**: {total}
+- **Documents with PDFs**: {info['with_pdfs']}
+- **Categories**: {len(info['categories'])}
+- **Unique Tags**: {info['total_tags']}
+- **Year Range**: {info['years'][0] if info['years'] else 'N/A'} - {info['years'][-1] if info['years'] else 'N/A'}
 
 ## 📚 Categories
-"""
-    
-    for category, count in sorted(database['info']['categories'].items()):
-        percentage = (count / database['info']['total_documents']) * 100
-        readme_content += f"- **{category.replace('_', ' ').title()}**: {count} documents ({percentage:.1f}%)\n"
-    
-    readme_content += f"
+{categories_md}
+
 ---
-*Generated from Zotero BibTeX export • Last updated: {database['info']['created']}*
+*Generated from Zotero BibTeX export - Last updated: {info['created']}*
 """
-    
+
     with open(output_path / 'README.md', 'w', encoding='utf-8') as f:
         f.write(readme_content)
 
@@ -386,7 +459,9 @@ Where zotero-export contains:
     
     parser.add_argument('export_dir', help='Path to Zotero export directory (contains .bib file and files/ folder)')
     parser.add_argument('output_dir', help='Path to output directory for GitHub database')
-    
+    parser.add_argument('--copy-mode', choices=['hardlink', 'copy', 'symlink'], default='hardlink',
+                        help='How to place PDFs in the output tree (default: hardlink, falls back to copy)')
+
     args = parser.parse_args()
     
     if not os.path.exists(args.export_dir):
@@ -394,7 +469,7 @@ Where zotero-export contains:
         return 1
     
     try:
-        process_bibtex_export(args.export_dir, args.output_dir)
+        process_bibtex_export(args.export_dir, args.output_dir, args.copy_mode)
         print(f"\n✅ Success! Your GitHub database is ready in: {args.output_dir}")
         print(f"📁 Next steps:")
         print(f"   1. cd {args.output_dir}")